@@ -0,0 +1,117 @@
+"""FrameProducer hand-off tests driven by a fake screen grabber."""
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+
+import yys_clicker
+
+WIDTH, HEIGHT = 8, 6
+
+
+class FakeShot:
+    def __init__(self, value: int) -> None:
+        self.width, self.height = WIDTH, HEIGHT
+        self.raw = bytearray([value % 256]) * (WIDTH * HEIGHT * 4)
+
+
+class FakeGrabber:
+    """Returns uniform frames numbered by grab; every third grab is slow."""
+
+    monitors = [None, {"left": 0, "top": 0, "width": WIDTH, "height": HEIGHT}]
+
+    def __init__(self) -> None:
+        self.grabs = 0
+
+    def __enter__(self) -> "FakeGrabber":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        return None
+
+    def grab(self, monitor) -> FakeShot:
+        self.grabs += 1
+        time.sleep(0.05 if self.grabs % 3 == 0 else 0.02)
+        return FakeShot(self.grabs)
+
+
+def _scan_like_run(producer: yys_clicker.FrameProducer, scans: int, held_values: list) -> None:
+    capture_at = time.perf_counter()
+    for scan in range(scans):
+        frames = producer.acquire(not_before=capture_at)
+        value = int(frames[None][0, 0])
+        time.sleep(0.005)  # "matching"
+        # The held set must not be written while we still use it.
+        assert int(frames[None][0, 0]) == value
+        held_values.append(value)
+        idle = 0.01 if scan % 2 else 0.03
+        capture_at = time.perf_counter() + max(idle - producer.capture_seconds, 0.0)
+        producer.request(capture_at)
+        time.sleep(idle)
+
+
+def test_acquire_keeps_returning_fresh_frames_with_varying_capture_times():
+    grabber = FakeGrabber()
+    producer = yys_clicker.FrameProducer([None], grabber_factory=lambda: grabber)
+    producer.start()
+    held_values: list = []
+    errors: list = []
+
+    def worker() -> None:
+        try:
+            _scan_like_run(producer, 20, held_values)
+        except BaseException as exc:  # reported below
+            errors.append(exc)
+
+    thread = threading.Thread(target=worker, daemon=True)
+    thread.start()
+    thread.join(timeout=10.0)
+    producer.stop()
+
+    assert not thread.is_alive(), f"acquire() stalled after {len(held_values)} scans"
+    assert not errors
+    assert len(held_values) == 20
+    # Each scan sees a newer capture than the one before.
+    assert all(later > earlier for earlier, later in zip(held_values, held_values[1:]))
+    # No runaway re-capturing: roughly one grab per scan.
+    assert grabber.grabs <= 2 * len(held_values) + 2
+
+
+def test_held_frame_is_not_overwritten_by_background_captures():
+    grabber = FakeGrabber()
+    producer = yys_clicker.FrameProducer([None], grabber_factory=lambda: grabber)
+    producer.start()
+    try:
+        held = producer.acquire(not_before=0.0)[None]
+        value = int(held[0, 0])
+        assert held is not yys_clicker._FRAME_BUF.get(None)
+
+        # Keep the frame while the producer captures twice more.
+        for _ in range(2):
+            grabs = grabber.grabs
+            producer.request(time.perf_counter())
+            deadline = time.perf_counter() + 5.0
+            while grabber.grabs == grabs or producer._capturing:
+                assert time.perf_counter() < deadline
+                time.sleep(0.005)
+            assert int(held[0, 0]) == value
+
+        newer = producer.acquire(not_before=0.0)[None]
+        assert newer is not held
+        assert int(newer[0, 0]) > value
+    finally:
+        producer.stop()
+
+
+def test_capture_errors_are_raised_from_acquire():
+    class BrokenGrabber(FakeGrabber):
+        def grab(self, monitor):
+            raise OSError("grab failed")
+
+    producer = yys_clicker.FrameProducer([None], grabber_factory=BrokenGrabber)
+    producer.start()
+    with pytest.raises(OSError, match="grab failed"):
+        producer.acquire(not_before=0.0)
+    producer.stop()
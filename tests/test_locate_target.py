@@ -0,0 +1,92 @@
+"""locate_target tests on synthetic screens with pixel-exact buttons."""
+from __future__ import annotations
+
+import cv2
+import numpy as np
+import pytest
+
+import yys_clicker
+
+
+def _texture(rng, shape):
+    return cv2.GaussianBlur(rng.integers(0, 256, shape, dtype=np.uint8), (5, 5), 0)
+
+
+def _button(rng, shape):
+    """Hard-edged blocks, like flat UI art; these lose most detail under pyrDown."""
+    height, width = shape
+    cells = rng.integers(0, 256, (height // 3 + 1, width // 3 + 1), dtype=np.uint8)
+    return cv2.resize(cells, (width, height), interpolation=cv2.INTER_NEAREST)
+
+
+def _make_target(tmp_path, button) -> yys_clicker.Target:
+    image_path = tmp_path / "button.png"
+    cv2.imwrite(str(image_path), cv2.cvtColor(button, cv2.COLOR_GRAY2BGR))
+    return yys_clicker.Target(name="button", image_path=image_path)
+
+
+@pytest.mark.parametrize("size", [(30, 50), (24, 24)])
+def test_finds_buttons_at_every_offset(tmp_path, size):
+    rng = np.random.default_rng(7)
+    button = _button(rng, size)
+    target = _make_target(tmp_path, button)
+    height, width = size
+
+    # Mix of even and odd offsets relative to the pyrDown grid.
+    for left, top in [(x, y) for x in (101, 202, 317, 450, 523) for y in (37, 150, 281)]:
+        screen = _texture(rng, (360, 640))
+        screen[top : top + height, left : left + width] = button
+        frame = yys_clicker.ScanFrame(screen, None)
+        assert yys_clicker.locate_target(target, 0.85, frame) == (left, top, width, height)
+
+
+@pytest.mark.parametrize("size", [(30, 50), (24, 24)])
+@pytest.mark.parametrize(
+    "shade",
+    [
+        lambda button: np.clip(button.astype(np.int16) + 30, 0, 255).astype(np.uint8),
+        lambda button: (button * 0.8).astype(np.uint8),
+    ],
+    ids=["brighter", "dimmer"],
+)
+def test_finds_buttons_with_shifted_brightness(tmp_path, size, shade):
+    rng = np.random.default_rng(11)
+    button = _button(rng, size)
+    target = _make_target(tmp_path, button)
+    height, width = size
+
+    for _ in range(20):
+        left = int(rng.integers(0, 640 - width))
+        top = int(rng.integers(0, 360 - height))
+        screen = _texture(rng, (360, 640))
+        screen[top : top + height, left : left + width] = shade(button)
+        frame = yys_clicker.ScanFrame(screen, None)
+        assert yys_clicker.locate_target(target, 0.85, frame) == (left, top, width, height)
+
+
+def test_ignores_buttons_that_are_not_on_screen(tmp_path):
+    rng = np.random.default_rng(8)
+    target = _make_target(tmp_path, _button(rng, (30, 50)))
+    frame = yys_clicker.ScanFrame(_texture(rng, (360, 640)), None)
+    assert yys_clicker.locate_target(target, 0.85, frame) is None
+
+
+def test_fft_scratch_buffers_are_stable_across_template_sizes(tmp_path):
+    rng = np.random.default_rng(9)
+    screen = _texture(rng, (360, 640))
+    targets = []
+    for index, (height, width) in enumerate([(20, 20), (15, 30)]):
+        image_path = tmp_path / f"button{index}.png"
+        cv2.imwrite(str(image_path), cv2.cvtColor(screen[50 : 50 + height, 80 : 80 + width], cv2.COLOR_GRAY2BGR))
+        targets.append(yys_clicker.Target(name=f"button{index}", image_path=image_path))
+
+    def scan() -> None:
+        frame = yys_clicker.ScanFrame(screen, None)
+        for target in targets:
+            yys_clicker.locate_target(target, 0.85, frame)
+
+    scan()
+    buffers = {key: id(buffer) for key, buffer in yys_clicker._SCRATCH_BUF.items()}
+    for _ in range(3):
+        scan()
+    assert {key: id(buffer) for key, buffer in yys_clicker._SCRATCH_BUF.items()} == buffers
@@ -0,0 +1,62 @@
+"""Grayscale template side-file cache tests."""
+from __future__ import annotations
+
+import os
+
+import cv2
+import numpy as np
+import pytest
+
+import yys_clicker
+
+
+def _write_button(path, offset=0):
+    gray = (np.arange(20 * 30, dtype=np.uint8).reshape(20, 30) + offset).astype(np.uint8)
+    cv2.imwrite(str(path), cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR))
+    return gray
+
+
+@pytest.fixture
+def image_path(tmp_path):
+    path = tmp_path / "button.png"
+    _write_button(path)
+    return path
+
+
+def test_cache_is_written_and_reused(image_path, monkeypatch):
+    first = yys_clicker.Target(name="button", image_path=image_path)
+    cache_path = first.template_cache_path
+    assert cache_path.exists()
+    assert not cache_path.with_name(cache_path.name + ".tmp").exists()
+
+    def fail_imread(*args, **kwargs):
+        raise AssertionError("the PNG should not be decoded again")
+
+    monkeypatch.setattr(cv2, "imread", fail_imread)
+    second = yys_clicker.Target(name="button", image_path=image_path)
+    np.testing.assert_array_equal(second.template, first.template)
+
+
+def test_replaced_png_with_an_older_mtime_invalidates_the_cache(image_path):
+    yys_clicker.Target(name="button", image_path=image_path)
+    stamp = image_path.stat().st_mtime_ns
+
+    # Same size, older timestamp: e.g. a screenshot copied in with its mtime kept.
+    replacement = _write_button(image_path, offset=7)
+    older = stamp - 3_600 * 10**9
+    os.utime(image_path, ns=(older, older))
+
+    target = yys_clicker.Target(name="button", image_path=image_path)
+    np.testing.assert_array_equal(target.template, replacement)
+
+
+@pytest.mark.parametrize("content", [b"", b"\x93NUMPY\x01\x00", b"PK\x03\x04"])
+def test_truncated_cache_falls_back_to_the_png(image_path, content):
+    cache_path = image_path.with_name(image_path.name + yys_clicker.TEMPLATE_CACHE_SUFFIX)
+    cache_path.write_bytes(content)
+
+    target = yys_clicker.Target(name="button", image_path=image_path)
+    assert target.template.shape == (20, 30)
+    # The broken file is replaced by a valid one.
+    with np.load(cache_path) as archive:
+        assert archive["template"].shape == (20, 30)
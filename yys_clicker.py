@@ -2,8 +2,8 @@
 
 The script watches for configured UI elements (PNG screenshots) on the
 screen, adds random delays and click offsets, and clicks the matching
-elements to simulate human behaviour. Screenshot-based template matching
-is performed with Pillow + OpenCV. Edit `targets.json` to describe the UI
+elements to simulate human behaviour. Screenshots are captured with mss and
+template matching is performed with OpenCV. Edit `targets.json` to describe the UI
 elements you wish to automate.
 
 Example usage::
@@ -15,20 +15,23 @@ Press Ctrl+C at any time to stop the automation.
 from __future__ import annotations
 
 import argparse
+import hashlib
 import json
-import random
+import os
 import sys
+import threading
 import time
+import zipfile
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Iterable, List, Optional, Sequence, Tuple
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
 
 try:
     import pyautogui  # type: ignore
 except ImportError as exc:  # pragma: no cover - runtime safeguard
     missing = getattr(exc, "name", "pyautogui")
     raise SystemExit(
-        "Missing dependency '{missing}'. Install it with 'pip install pyautogui pyscreeze pillow opencv-python'.".format(
+        "Missing dependency '{missing}'. Install it with 'pip install pyautogui pyscreeze mss opencv-python'.".format(
             missing=missing
         )
     ) from exc
@@ -44,13 +47,81 @@ except ImportError as exc:  # pragma: no cover - runtime safeguard
     raise SystemExit("OpenCV is required. Install it with 'pip install opencv-python'.") from exc
 
 try:
-    from PIL import ImageGrab
+    from numba import njit  # type: ignore
+except ImportError:  # pragma: no cover - numba is an optional speed-up
+
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+
+try:
+    import xxhash  # type: ignore
+except ImportError:  # pragma: no cover - xxhash is an optional speed-up
+    xxhash = None
+
+try:
+    import mss  # type: ignore
 except ImportError as exc:  # pragma: no cover - runtime safeguard
-    raise SystemExit("Pillow is required for screen capture. Install it with 'pip install pillow'.") from exc
+    raise SystemExit("mss is required for screen capture. Install it with 'pip install mss'.") from exc
 
 Region = Tuple[int, int, int, int]
 Range = Tuple[float, float]
 BoundingBox = Tuple[int, int, int, int]
+PyramidLevel = Tuple[np.ndarray, int, int]
+
+# Coarse-to-fine matching: each pyrDown halves both dimensions, so two levels
+# (4x) cut the full-frame correlation work by roughly 16x. Templates are never
+# shrunk below PYRAMID_MIN_TEMPLATE_SIDE pixels so the coarse peak stays reliable.
+PYRAMID_MAX_LEVELS = 2
+PYRAMID_MIN_TEMPLATE_SIDE = 12
+PYRAMID_REFINE_MARGIN = 4
+# From this template area up, the coarse TM_CCOEFF_NORMED sweep is computed in
+# the frequency domain (O(n log n)) instead of spatially (O(W*H*w*h)).
+FFT_MIN_TEMPLATE_AREA = 18 * 18
+
+RNG = np.random.default_rng()
+
+# Cursor updates per second for smooth_move.
+MOVE_RATE_HZ = 100
+
+# Targets that keep missing are only matched on every other scan once their
+# miss streak reaches this length; any hit resets the streak.
+SCHEDULER_MISS_STREAK = 10
+
+# cv::parallel_for_ wakes OpenCV's thread pool for every matchTemplate and
+# cvtColor call. For small search regions the wake-up costs more than the
+# kernel, so OpenCV runs single-threaded below this area and uses at most
+# CV_MAX_THREADS otherwise. cv2.setNumThreads governs whichever backend
+# (TBB, OpenMP, pthreads) the wheel was built with.
+CV_SINGLE_THREAD_AREA = 640 * 480
+CV_MAX_THREADS = 4
+
+# Set by enable_opencl(); when true the coarse sweep runs on cv2.UMat.
+_USE_OPENCL = False
+
+# Frames whose brightest and darkest pixels differ by less than this (solid
+# loading screens, fades) cannot contain a textured template and are skipped.
+# The pixel range is used rather than the standard deviation, which a small
+# button on a large plain region barely moves.
+FLAT_FRAME_CONTRAST = 8
+
+# Templates are stored starting on a 32-byte boundary with every row padded to a
+# multiple of 32 bytes, so each row of OpenCV's AVX2 kernels starts aligned.
+TEMPLATE_ALIGNMENT = 32
+TEMPLATE_CACHE_SUFFIX = ".npz"
+
+_PYRAMID_BUF: Dict[Optional[Region], List[np.ndarray]] = {}
+_DFT_INPUT_BUF: Dict[Tuple[Optional[Region], int], np.ndarray] = {}
+# Per-scan working arrays (spectra, integrals, score maps). They are only
+# touched from the scan loop's thread and are overwritten on the next scan.
+_SCRATCH_BUF: Dict[Tuple, np.ndarray] = {}
+
+# A single mss instance keeps its device context alive between scans; the
+# grayscale output of each region is written into the same array every time.
+_SCT: Optional["mss.base.MSSBase"] = None
+_FRAME_BUF: Dict[Optional[Region], np.ndarray] = {}
 
 
 @dataclass
@@ -69,6 +140,15 @@ class Target:
     template: np.ndarray = field(init=False, repr=False)
     template_height: int = field(init=False, repr=False)
     template_width: int = field(init=False, repr=False)
+    template_contrast: float = field(init=False, repr=False)
+    template_pyramid: List[PyramidLevel] = field(init=False, repr=False)
+    result_buffers: Dict[Tuple[int, int], np.ndarray] = field(
+        init=False, repr=False, default_factory=dict
+    )
+    template_spectra: Dict[Tuple[int, int, int], Tuple[np.ndarray, float]] = field(
+        init=False, repr=False, default_factory=dict
+    )
+    template_umats: Dict[int, "cv2.UMat"] = field(init=False, repr=False, default_factory=dict)
 
     def __post_init__(self) -> None:
         self._load_template()
@@ -108,20 +188,116 @@ class Target:
         return target
 
     def _load_template(self) -> None:
-        image_bgr = cv2.imread(str(self.image_path), cv2.IMREAD_COLOR)
-        if image_bgr is None:
-            raise ValueError(f"Failed to read image file: {self.image_path}")
-        template_gray = cv2.cvtColor(image_bgr, cv2.COLOR_BGR2GRAY)
-        if template_gray.size == 0:
-            raise ValueError(f"Template image is empty: {self.image_path}")
+        # Stat before decoding: if the PNG is swapped mid-load, the stored stamp
+        # is the older one and the next start simply decodes again.
+        try:
+            source = self.image_path.stat()
+            source_stamp: Optional[Tuple[int, int]] = (source.st_mtime_ns, source.st_size)
+        except OSError:
+            source_stamp = None
+        template_gray = self._load_cached_template(source_stamp) if source_stamp else None
+        if template_gray is None:
+            image_bgr = cv2.imread(str(self.image_path), cv2.IMREAD_COLOR)
+            if image_bgr is None:
+                raise ValueError(f"Failed to read image file: {self.image_path}")
+            template_gray = cv2.cvtColor(image_bgr, cv2.COLOR_BGR2GRAY)
+            if template_gray.size == 0:
+                raise ValueError(f"Template image is empty: {self.image_path}")
+            if source_stamp:
+                self._store_cached_template(template_gray, source_stamp)
+        template_gray = _aligned_copy(template_gray)
         self.template = template_gray
         self.template_height, self.template_width = template_gray.shape[:2]
+        low, high, _, _ = cv2.minMaxLoc(template_gray)
+        self.template_contrast = high - low
+
+        self.template_pyramid = [(template_gray, self.template_height, self.template_width)]
+        level_image = template_gray
+        while (
+            len(self.template_pyramid) <= PYRAMID_MAX_LEVELS
+            and min(level_image.shape[:2]) // 2 >= PYRAMID_MIN_TEMPLATE_SIDE
+        ):
+            level_image = _aligned_copy(cv2.pyrDown(level_image))
+            height, width = level_image.shape[:2]
+            self.template_pyramid.append((level_image, height, width))
+
+    @property
+    def template_cache_path(self) -> Path:
+        return self.image_path.with_name(self.image_path.name + TEMPLATE_CACHE_SUFFIX)
+
+    def _load_cached_template(self, source_stamp: Tuple[int, int]) -> Optional[np.ndarray]:
+        """Return the grayscale side-file if it was built from this exact source image.
+
+        ``source_stamp`` is the PNG's ``(st_mtime_ns, st_size)``; any difference,
+        including a replacement with an older timestamp, invalidates the cache.
+        """
+        try:
+            archive = np.load(self.template_cache_path, allow_pickle=False)
+            if not isinstance(archive, np.lib.npyio.NpzFile):
+                return None
+            with archive:
+                if tuple(archive["source"].tolist()) != source_stamp:
+                    return None
+                cached = archive["template"]
+        except (OSError, ValueError, EOFError, KeyError, zipfile.BadZipFile):
+            return None  # Missing, truncated or otherwise unreadable: decode the PNG.
+        if cached.dtype != np.uint8 or cached.ndim != 2 or cached.size == 0:
+            return None
+        return cached
+
+    def _store_cached_template(self, template_gray: np.ndarray, source_stamp: Tuple[int, int]) -> None:
+        # Write beside the target and rename into place, so an interrupted
+        # save (or a full disk) never leaves a truncated cache behind.
+        cache_path = self.template_cache_path
+        temp_path = cache_path.with_name(cache_path.name + ".tmp")
+        try:
+            with open(temp_path, "wb") as handle:
+                np.savez(handle, template=template_gray, source=np.array(source_stamp, dtype=np.int64))
+            os.replace(temp_path, cache_path)
+        except OSError:
+            # Read-only image folders simply skip the cache.
+            try:
+                temp_path.unlink()
+            except OSError:
+                pass
+
+    @property
+    def pyramid_levels(self) -> int:
+        return len(self.template_pyramid) - 1
+
+    def template_umat(self, level: int) -> "cv2.UMat":
+        """Device copy of a pyramid level, uploaded on first use."""
+        umat = self.template_umats.get(level)
+        if umat is None:
+            umat = self.template_umats[level] = cv2.UMat(self.template_pyramid[level][0])
+        return umat
+
+
+def _aligned_copy(image: np.ndarray) -> np.ndarray:
+    """Copy a 2-D ``image`` into TEMPLATE_ALIGNMENT-aligned, row-padded storage.
+
+    The result is a view of the first ``width`` columns of the padded buffer;
+    OpenCV accepts the wider row step as is, so no mask or copy is needed.
+    """
+    height, width = image.shape
+    pitch = -(-width * image.itemsize // TEMPLATE_ALIGNMENT) * TEMPLATE_ALIGNMENT
+    raw = np.zeros(height * pitch + TEMPLATE_ALIGNMENT, dtype=np.uint8)
+    offset = -raw.ctypes.data % TEMPLATE_ALIGNMENT
+    padded = raw[offset : offset + height * pitch].view(image.dtype).reshape(height, -1)
+    aligned = padded[:, :width]
+    aligned[...] = image
+    return aligned
+
+
+# JSON arrays load as lists and defaults/argparse values are lists or tuples;
+# an exact type check is cheaper than the Sequence ABC and rejects strings.
+_SEQUENCE_TYPES = (list, tuple)
 
 
 def _parse_region(value) -> Optional[Region]:
     if value is None:
         return None
-    if not isinstance(value, Sequence) or len(value) != 4:
+    if type(value) not in _SEQUENCE_TYPES or len(value) != 4:
         raise ValueError("Region must be a sequence of four integers: left, top, width, height")
     left, top, width, height = map(int, value)
     return left, top, width, height
@@ -130,14 +306,9 @@ def _parse_region(value) -> Optional[Region]:
 def _parse_range(value, fallback: Range) -> Range:
     if value is None:
         return fallback
-    if isinstance(value, tuple):
-        low, high = value
-    else:
-        if not isinstance(value, Sequence) or len(value) != 2:
-            raise ValueError("Ranges must contain two numeric values: min, max")
-        low, high = value
-    low = float(low)
-    high = float(high)
+    if type(value) not in _SEQUENCE_TYPES or len(value) != 2:
+        raise ValueError("Ranges must contain two numeric values: min, max")
+    low, high = map(float, value)
     if low > high:
         raise ValueError(f"Invalid range: min {low} is greater than max {high}")
     return low, high
@@ -157,40 +328,530 @@ def load_targets(path: Path) -> List[Target]:
     return targets
 
 
-def capture_screen(region: Optional[Region]) -> np.ndarray:
+def _screen_grabber() -> "mss.base.MSSBase":
+    global _SCT
+    if _SCT is None:
+        _SCT = mss.mss()
+    return _SCT
+
+
+@dataclass
+class TargetSoA:
+    """Structure-of-arrays view of the targets, used by the scan loop.
+
+    The per-scan bookkeeping (thresholds, scheduling, region lookup) only
+    touches the small numeric arrays; the :class:`Target` objects are
+    consulted once a target is actually matched.
+    """
+
+    targets: List[Target]
+    names: List[str]
+    confidences: np.ndarray
+    template_sizes: np.ndarray
+    region_keys: List[Optional[Region]]
+    region_ids: np.ndarray
+
+    @classmethod
+    def from_targets(cls, targets: Sequence[Target]) -> "TargetSoA":
+        region_keys = list(dict.fromkeys(t.search_region for t in targets))
+        region_index = {key: index for index, key in enumerate(region_keys)}
+        return cls(
+            targets=list(targets),
+            names=[t.name for t in targets],
+            confidences=np.array([t.confidence for t in targets], dtype=np.float64),
+            template_sizes=np.array(
+                [(t.template_height, t.template_width) for t in targets], dtype=np.int32
+            ).reshape(-1, 2),
+            region_keys=region_keys,
+            region_ids=np.array([region_index[t.search_region] for t in targets], dtype=np.int32),
+        )
+
+    def __len__(self) -> int:
+        return len(self.targets)
+
+
+def capture_screen(
+    region: Optional[Region],
+    sct: Optional["mss.base.MSSBase"] = None,
+    out: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """Grab ``region`` (or the primary monitor) as grayscale.
+
+    The frame is written into ``out`` when it has the right shape, otherwise
+    into a newly allocated array. Callers passing neither ``sct`` nor ``out``
+    share a per-region module buffer, which the next such capture overwrites.
+    mss handles must not be shared between threads, so background threads
+    pass their own ``sct`` (and thereby never touch the module buffer).
+    """
+    use_module_buffer = sct is None and out is None
+    if sct is None:
+        sct = _screen_grabber()
     if region is None:
-        bbox = None
+        monitor = sct.monitors[1]
     else:
         left, top, width, height = region
-        bbox = (left, top, left + width, top + height)
-    screenshot = ImageGrab.grab(bbox=bbox)
-    frame = cv2.cvtColor(np.array(screenshot), cv2.COLOR_RGB2GRAY)
+        monitor = {"left": left, "top": top, "width": width, "height": height}
+    shot = sct.grab(monitor)
+    height, width = shot.height, shot.width
+    # mss delivers BGRA natively; converting that directly avoids building the
+    # intermediate RGB copy that ``shot.rgb`` assembles in Python.
+    bgra = np.frombuffer(shot.raw, dtype=np.uint8).reshape(height, width, 4)
+
+    frame = _FRAME_BUF.get(region) if use_module_buffer else out
+    if frame is None or frame.shape != (height, width):
+        frame = np.empty((height, width), dtype=np.uint8)
+        if use_module_buffer:
+            _FRAME_BUF[region] = frame
+    cv2.cvtColor(bgra, cv2.COLOR_BGRA2GRAY, dst=frame)
     return frame
 
 
-def locate_target(target: Target, confidence: float) -> Optional[BoundingBox]:
-    search_image = capture_screen(target.search_region)
-    if (
-        search_image.shape[0] < target.template_height
-        or search_image.shape[1] < target.template_width
-    ):
-        return None
+CapturePlan = Dict[Optional[Region], Tuple[Optional[Region], Tuple[slice, slice]]]
+
+
+def plan_captures(regions: Iterable[Optional[Region]], screen: Region) -> CapturePlan:
+    """Map every search region to the captured region that contains it.
+
+    Regions lying entirely inside another one (``None`` standing for the
+    primary ``screen``) are not captured themselves; they are sliced out of
+    the larger capture. Each entry is ``(captured_region, (rows, columns))``
+    where the slices select the region inside that capture.
+    """
+    bounds = {region: screen if region is None else region for region in regions}
+    plan: CapturePlan = {}
+    captured: List[Optional[Region]] = []
+    for region in sorted(bounds, key=lambda r: bounds[r][2] * bounds[r][3], reverse=True):
+        left, top, width, height = bounds[region]
+        for outer in captured:
+            outer_left, outer_top, outer_width, outer_height = bounds[outer]
+            if (
+                outer_left <= left
+                and outer_top <= top
+                and left + width <= outer_left + outer_width
+                and top + height <= outer_top + outer_height
+            ):
+                row, column = top - outer_top, left - outer_left
+                plan[region] = (outer, (slice(row, row + height), slice(column, column + width)))
+                break
+        else:
+            captured.append(region)
+            plan[region] = (region, (slice(None), slice(None)))
+    return plan
+
+
+class FrameProducer:
+    """Captures every scan region on a background thread.
+
+    The main thread asks for a frame set to be captured at a given moment
+    (typically shortly before its idle sleep ends), so the capture runs while
+    the main thread is still sleeping or matching. Three buffer sets rotate
+    between roles: the set handed out by :meth:`acquire` (held until the next
+    :meth:`acquire` call), the newest finished set, and the one being
+    written. A capture always goes into a set that is neither held nor
+    ready, so a finished frame is never overwritten before it is consumed.
+    OpenCV and mss both release the GIL, so a thread is enough to overlap
+    the work.
+    """
+
+    SLOTS = 3
+
+    def __init__(
+        self,
+        regions: Iterable[Optional[Region]],
+        grabber_factory: Optional[Callable[[], "mss.base.MSSBase"]] = None,
+    ) -> None:
+        self.regions = list(dict.fromkeys(regions))
+        self.capture_seconds = 0.0
+        # mss handles are per thread, so the producer opens its own.
+        self._grabber_factory = grabber_factory or mss.mss
+        self._buffers: List[Dict[Optional[Region], np.ndarray]] = [{} for _ in range(self.SLOTS)]
+        self._stamps = [0.0] * self.SLOTS
+        self._ready: Optional[int] = None
+        self._in_use: Optional[int] = None
+        self._capturing = False
+        self._request_at: Optional[float] = None
+        self._stopped = False
+        self._error: Optional[BaseException] = None
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._loop, name="frame-producer", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        self._thread.join(timeout=1.0)
+
+    def request(self, at: float) -> None:
+        """Capture the next frame set once ``time.perf_counter()`` reaches ``at``."""
+        with self._cond:
+            self._request_at = at
+            self._cond.notify_all()
+
+    def acquire(self, not_before: float) -> Dict[Optional[Region], np.ndarray]:
+        """Return a frame set whose capture started at or after ``not_before``.
+
+        The previously acquired set is released and may be overwritten.
+        """
+        with self._cond:
+            self._in_use = None
+            while True:
+                if self._error is not None:
+                    raise self._error
+                if self._ready is not None and self._stamps[self._ready] >= not_before:
+                    break
+                # Only ask for a capture when none is pending or in flight; the
+                # one in flight may already satisfy ``not_before``.
+                if self._request_at is None and not self._capturing:
+                    self._request_at = max(not_before, time.perf_counter())
+                    self._cond.notify_all()
+                self._cond.wait()
+            slot = self._in_use = self._ready
+            self._ready = None
+        return self._buffers[slot]
+
+    def _next_slot(self) -> Optional[Tuple[int, float]]:
+        with self._cond:
+            while not self._stopped:
+                if self._request_at is None:
+                    self._cond.wait()
+                    continue
+                remaining = self._request_at - time.perf_counter()
+                if remaining > 0:
+                    self._cond.wait(remaining)
+                    continue
+                self._request_at = None
+                self._capturing = True
+                busy = (self._ready, self._in_use)
+                slot = next(index for index in range(self.SLOTS) if index not in busy)
+                return slot, time.perf_counter()
+            return None
+
+    def _loop(self) -> None:
+        try:
+            with self._grabber_factory() as sct:
+                while True:
+                    claimed = self._next_slot()
+                    if claimed is None:
+                        return
+                    slot, stamp = claimed
+                    frames = self._buffers[slot]
+                    for region in self.regions:
+                        frames[region] = capture_screen(region, sct, frames.get(region))
+                    elapsed = time.perf_counter() - stamp
+                    with self._cond:
+                        self.capture_seconds = elapsed
+                        self._capturing = False
+                        self._ready = slot
+                        self._stamps[slot] = stamp
+                        self._cond.notify_all()
+        except BaseException as exc:  # surfaced to the main thread by acquire()
+            with self._cond:
+                self._error = exc
+                self._capturing = False
+                self._cond.notify_all()
+
+
+def build_frame_pyramid(frame: np.ndarray, levels: int, key: Optional[Region]) -> List[np.ndarray]:
+    """Downsample ``frame`` ``levels`` times, reusing the buffers cached for ``key``."""
+    buffers = _PYRAMID_BUF.setdefault(key, [])
+    pyramid = [frame]
+    for level in range(levels):
+        source = pyramid[-1]
+        shape = ((source.shape[0] + 1) // 2, (source.shape[1] + 1) // 2)
+        if len(buffers) <= level:
+            buffers.append(np.empty(shape, dtype=np.uint8))
+        elif buffers[level].shape != shape:
+            buffers[level] = np.empty(shape, dtype=np.uint8)
+        pyramid.append(cv2.pyrDown(source, dst=buffers[level]))
+    return pyramid
+
+
+def _fits(image: np.ndarray, height: int, width: int) -> bool:
+    return image.shape[0] >= height and image.shape[1] >= width
 
-    result = cv2.matchTemplate(search_image, target.template, cv2.TM_CCOEFF_NORMED)
+
+def _match(
+    target: Target, image: np.ndarray, template: np.ndarray, method: int
+) -> Tuple[float, Tuple[int, int]]:
+    """Run ``matchTemplate`` into a cached result buffer and return the best score."""
+    shape = (image.shape[0] - template.shape[0] + 1, image.shape[1] - template.shape[1] + 1)
+    result = target.result_buffers.get(shape)
+    if result is None:
+        result = target.result_buffers[shape] = np.empty(shape, dtype=np.float32)
+    cv2.matchTemplate(image, template, method, result=result)
     _, max_val, _, max_loc = cv2.minMaxLoc(result)
+    return max_val, max_loc
+
+
+def frame_digest(frame: np.ndarray) -> bytes:
+    """Cheap fingerprint used to notice that a region has not changed between scans."""
+    if not frame.flags.c_contiguous:
+        # Sub-region views of a larger capture are hashed from a packed copy.
+        packed = _scratch(("digest",) + frame.shape, frame.shape, frame.dtype)
+        np.copyto(packed, frame)
+        frame = packed
+    if xxhash is not None:
+        return xxhash.xxh3_64_digest(frame)
+    return hashlib.blake2b(frame, digest_size=8).digest()
+
+
+def _scratch(key: Tuple, shape: Tuple[int, ...], dtype) -> np.ndarray:
+    """Return the cached working array for ``key``, reallocating only on shape changes.
+
+    Buffers whose size depends on the template must carry that shape in
+    ``key``; otherwise targets of different sizes keep reallocating each
+    other's buffers.
+    """
+    buffer = _SCRATCH_BUF.get(key)
+    if buffer is None or buffer.shape != shape or buffer.dtype != dtype:
+        buffer = _SCRATCH_BUF[key] = np.empty(shape, dtype=dtype)
+    return buffer
+
+
+def frame_spectrum(image: np.ndarray, key: Tuple[Optional[Region], int]) -> np.ndarray:
+    """Forward DFT of ``image`` zero-padded to an optimal size; ``key`` selects the buffers."""
+    dft_shape = (cv2.getOptimalDFTSize(image.shape[0]), cv2.getOptimalDFTSize(image.shape[1]))
+    padded = _DFT_INPUT_BUF.get(key)
+    if padded is None or padded.shape != dft_shape:
+        padded = _DFT_INPUT_BUF[key] = np.zeros(dft_shape, dtype=np.float32)
+    padded[: image.shape[0], : image.shape[1]] = image
+    return cv2.dft(padded, dst=_scratch(("spectrum",) + key, dft_shape, np.float32))
+
+
+@dataclass
+class ScanFrame:
+    """A captured search image plus the data derived from it during one scan.
+
+    All targets sharing a search region are matched against the same
+    ScanFrame, so the pyramid, each level's DFT and the digest are computed
+    at most once per scan no matter how many templates use them.
+    """
+
+    image: np.ndarray
+    region: Optional[Region]
+    pyramid: List[np.ndarray] = field(init=False, repr=False)
+    spectra: Dict[int, np.ndarray] = field(init=False, repr=False, default_factory=dict)
+    integrals: Dict[int, Tuple[np.ndarray, np.ndarray]] = field(init=False, repr=False, default_factory=dict)
+    _digest: Optional[bytes] = field(init=False, repr=False, default=None)
+    _contrast: Optional[float] = field(init=False, repr=False, default=None)
+    umats: Dict[int, "cv2.UMat"] = field(init=False, repr=False, default_factory=dict)
+
+    def __post_init__(self) -> None:
+        self.pyramid = [self.image]
+
+    def pyramid_to(self, levels: int) -> List[np.ndarray]:
+        if len(self.pyramid) <= levels:
+            self.pyramid = build_frame_pyramid(self.image, levels, self.region)
+        return self.pyramid
+
+    def spectrum(self, level: int) -> np.ndarray:
+        spectrum = self.spectra.get(level)
+        if spectrum is None:
+            spectrum = self.spectra[level] = frame_spectrum(self.pyramid[level], (self.region, level))
+        return spectrum
+
+    def integral(self, level: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Integral images of pixels and squared pixels, for per-window statistics."""
+        integral = self.integrals.get(level)
+        if integral is None:
+            image = self.pyramid[level]
+            shape = (image.shape[0] + 1, image.shape[1] + 1)
+            key = (self.region, level)
+            integral = self.integrals[level] = cv2.integral2(
+                image,
+                sum=_scratch(("sum",) + key, shape, np.int32),
+                sqsum=_scratch(("sqsum",) + key, shape, np.float64),
+                sdepth=cv2.CV_32S,
+                sqdepth=cv2.CV_64F,
+            )
+        return integral
+
+    def umat(self, level: int) -> "cv2.UMat":
+        umat = self.umats.get(level)
+        if umat is None:
+            umat = self.umats[level] = cv2.UMat(self.pyramid[level])
+        return umat
+
+    def contrast(self) -> float:
+        if self._contrast is None:
+            low, high, _, _ = cv2.minMaxLoc(self.image)
+            self._contrast = high - low
+        return self._contrast
+
+    def digest(self) -> bytes:
+        if self._digest is None:
+            self._digest = frame_digest(self.image)
+        return self._digest
+
+
+def _template_spectrum(target: Target, level: int, dft_shape: Tuple[int, int]) -> Tuple[np.ndarray, float]:
+    key = (level, dft_shape[0], dft_shape[1])
+    cached = target.template_spectra.get(key)
+    if cached is None:
+        # Zero-mean template: its correlation with any window equals that of
+        # the mean-subtracted window, which is what TM_CCOEFF needs.
+        template = target.template_pyramid[level][0].astype(np.float32)
+        template -= template.mean()
+        padded = np.zeros(dft_shape, dtype=np.float32)
+        padded[: template.shape[0], : template.shape[1]] = template
+        cached = (cv2.dft(padded), cv2.norm(template, cv2.NORM_L2SQR))
+        target.template_spectra[key] = cached
+    return cached
+
+
+def _window_sums(integral: np.ndarray, height: int, width: int, out: np.ndarray) -> np.ndarray:
+    """Sum of every ``height x width`` window of an integral image, into ``out``."""
+    rows, cols = out.shape
+    np.subtract(integral[height : height + rows, width : width + cols], integral[:rows, width : width + cols], out=out)
+    np.subtract(out, integral[height : height + rows, :cols], out=out)
+    np.add(out, integral[:rows, :cols], out=out)
+    return out
+
+
+def _ccoeff_fft(target: Target, frame: ScanFrame, level: int) -> Tuple[int, int]:
+    """Location of the best ``TM_CCOEFF_NORMED`` match, computed via the frame spectrum.
+
+    The padded size is at least the frame size, so circular wrap-around never
+    reaches the valid correlation window. All intermediates live in scratch
+    buffers, so steady-state scans do not allocate.
+    """
+    image = frame.pyramid[level]
+    spectrum = frame.spectrum(level)
+    _, height, width = target.template_pyramid[level]
+    template_spectrum, template_var = _template_spectrum(target, level, spectrum.shape)
+    product = cv2.mulSpectrums(
+        spectrum,
+        template_spectrum,
+        0,
+        c=_scratch(("product",) + spectrum.shape, spectrum.shape, np.float32),
+        conjB=True,
+    )
+    correlation = cv2.idft(
+        product,
+        dst=_scratch(("correlation",) + spectrum.shape, spectrum.shape, np.float32),
+        flags=cv2.DFT_SCALE | cv2.DFT_REAL_OUTPUT,
+    )
+
+    rows = image.shape[0] - height + 1
+    cols = image.shape[1] - width + 1
+    integral, sqintegral = frame.integral(level)
+    window_sum = _window_sums(integral, height, width, _scratch(("window_sum", rows, cols), (rows, cols), np.float64))
+    window_sq = _window_sums(sqintegral, height, width, _scratch(("window_sq", rows, cols), (rows, cols), np.float64))
+
+    # correlation / sqrt((window_sq - window_sum**2 / n) * template_var)
+    np.multiply(window_sum, window_sum, out=window_sum)
+    window_sum /= height * width
+    denominator = _scratch(("denominator", rows, cols), (rows, cols), np.float64)
+    np.subtract(window_sq, window_sum, out=denominator)
+    np.maximum(denominator, 0.0, out=denominator)
+    denominator *= template_var
+    denominator += 1e-12
+    np.sqrt(denominator, out=denominator)
+    normed = _scratch(("normed", rows, cols), (rows, cols), np.float64)
+    np.divide(correlation[:rows, :cols], denominator, out=normed)
+    y, x = divmod(int(np.argmax(normed)), cols)
+    return x, y
+
+
+def locate_target(
+    target: Target, confidence: float, frame: Optional[ScanFrame] = None
+) -> Optional[BoundingBox]:
+    if frame is None:
+        frame = ScanFrame(capture_screen(target.search_region), target.search_region)
+    if not _fits(frame.image, target.template_height, target.template_width):
+        return None
+    if frame.contrast() < FLAT_FRAME_CONTRAST <= target.template_contrast:
+        return None
+
+    pyramid = frame.pyramid_to(target.pyramid_levels)
+    level = target.pyramid_levels
+    while level > 0 and not _fits(pyramid[level], *target.template_pyramid[level][1:]):
+        level -= 1
+
+    # Coarse sweep over the whole (downsampled) frame. It uses the same
+    # zero-mean TM_CCOEFF_NORMED score as the final check, so a button that is
+    # brighter or dimmer than its screenshot is still picked as the candidate.
+    template, height, width = target.template_pyramid[level]
+    if _USE_OPENCL:
+        # Only the frame goes to the device; minMaxLoc reads the result there.
+        result = cv2.matchTemplate(frame.umat(level), target.template_umat(level), cv2.TM_CCOEFF_NORMED)
+        _, _, _, (x, y) = cv2.minMaxLoc(result)
+    elif height * width >= FFT_MIN_TEMPLATE_AREA:
+        x, y = _ccoeff_fft(target, frame, level)
+    else:
+        _, (x, y) = _match(target, pyramid[level], template, cv2.TM_CCOEFF_NORMED)
+    if level == 0:
+        window = pyramid[0][y : y + height, x : x + width]
+        score, _ = _match(target, window, template, cv2.TM_CCOEFF_NORMED)
 
-    if max_val < confidence:
+    # Refine the candidate at each finer level inside a small ROI only. Coarse
+    # scores are not used to reject: a match at an odd offset relative to
+    # pyrDown can correlate far worse at the coarse level than at full size.
+    for level in range(level - 1, -1, -1):
+        image = pyramid[level]
+        template, height, width = target.template_pyramid[level]
+        x = min(x * 2, image.shape[1] - width)
+        y = min(y * 2, image.shape[0] - height)
+        x0 = max(x - PYRAMID_REFINE_MARGIN, 0)
+        y0 = max(y - PYRAMID_REFINE_MARGIN, 0)
+        x1 = min(x + width + PYRAMID_REFINE_MARGIN, image.shape[1])
+        y1 = min(y + height + PYRAMID_REFINE_MARGIN, image.shape[0])
+        score, (dx, dy) = _match(target, image[y0:y1, x0:x1], template, cv2.TM_CCOEFF_NORMED)
+        x, y = x0 + dx, y0 + dy
+
+    if score < confidence:
         return None
 
     offset_x = target.search_region[0] if target.search_region else 0
     offset_y = target.search_region[1] if target.search_region else 0
-    left = offset_x + int(max_loc[0])
-    top = offset_y + int(max_loc[1])
+    left = offset_x + int(x)
+    top = offset_y + int(y)
     return left, top, target.template_width, target.template_height
 
 
-def random_point_within_region(box: BoundingBox, margin: int) -> Tuple[int, int]:
-    left, top, width, height = box
+class ScanScheduler:
+    """Decides which targets to match, and in which order, on each scan.
+
+    The most recently clicked targets come first (the game tends to show the
+    same buttons repeatedly), ties are broken by template area so cheap
+    matches run before expensive ones, and long-missing targets are sampled
+    on alternating scans only. Targets are referred to by their index in the
+    :class:`TargetSoA`.
+    """
+
+    def __init__(self, soa: "TargetSoA") -> None:
+        count = len(soa)
+        self.costs = soa.template_sizes[:, 0].astype(np.int64) * soa.template_sizes[:, 1]
+        # Move-to-front ranks: 0 is the latest hit, ``count`` means never hit.
+        self.recency = np.full(count, count, dtype=np.int32)
+        self.misses = np.zeros(count, dtype=np.int32)
+        self.scan_count = 0
+
+    def order(self) -> np.ndarray:
+        self.scan_count += 1
+        candidates = np.lexsort((self.costs, self.recency))
+        if self.scan_count % 2:
+            return candidates
+        return candidates[self.misses[candidates] < SCHEDULER_MISS_STREAK]
+
+    def record_hit(self, index: int) -> None:
+        self.misses[index] = 0
+        self.recency[self.recency < self.recency[index]] += 1
+        self.recency[index] = 0
+
+    def record_miss(self, index: int) -> None:
+        self.misses[index] += 1
+
+
+# An explicit signature compiles the function at import time instead of on
+# the first click.
+@njit("UniTuple(int64, 2)(int64, int64, int64, int64, int64, float64, float64)", cache=True)
+def _point_within_region(
+    left: int, top: int, width: int, height: int, margin: int, u_x: float, u_y: float
+) -> Tuple[int, int]:
     width = max(width, 1)
     height = max(height, 1)
 
@@ -207,22 +868,64 @@ def random_point_within_region(box: BoundingBox, margin: int) -> Tuple[int, int]
     if min_y >= max_y:
         min_y, max_y = top, top + height
 
-    return random.randint(int(min_x), int(max_x)), random.randint(int(min_y), int(max_y))
+    # u_x, u_y are in [0, 1), so this picks uniformly from the inclusive bounds.
+    return min_x + int(u_x * (max_x - min_x + 1)), min_y + int(u_y * (max_y - min_y + 1))
+
+
+def random_point_within_region(
+    box: BoundingBox, margin: int, uniforms: Optional[np.ndarray] = None
+) -> Tuple[int, int]:
+    if uniforms is None:
+        uniforms = RNG.random(2)
+    left, top, width, height = box
+    return _point_within_region(
+        int(left), int(top), int(width), int(height), int(margin), float(uniforms[0]), float(uniforms[1])
+    )
+
+
+def scale_uniform(u: float, range_pair: Range) -> float:
+    low, high = range_pair
+    return low + float(u) * (high - low)
 
 
 def choose_random(range_pair: Range) -> float:
-    return random.uniform(*range_pair)
+    return scale_uniform(RNG.random(), range_pair)
+
+
+def smooth_move(x: int, y: int, duration: float) -> None:
+    """Move the cursor to ``(x, y)`` along an eased path taking ``duration`` seconds.
+
+    Unlike ``pyautogui.moveTo(duration=...)``, each step is paced against a
+    ``perf_counter`` deadline, so sleep overshoot does not accumulate and the
+    move ends on time.
+    """
+    start_x, start_y = pyautogui.position()
+    steps = max(2, int(duration * MOVE_RATE_HZ))
+    t = np.linspace(0.0, 1.0, steps + 1)[1:]
+    eased = t * t * (3.0 - 2.0 * t)  # smoothstep, a cubic Bezier ease-in-out
+    xs = np.rint(start_x + (x - start_x) * eased).astype(int).tolist()
+    ys = np.rint(start_y + (y - start_y) * eased).astype(int).tolist()
+
+    start = time.perf_counter()
+    for step, (px, py) in enumerate(zip(xs, ys), 1):
+        pyautogui.failSafeCheck()
+        pyautogui.platformModule._moveTo(px, py)
+        remaining = start + duration * step / steps - time.perf_counter()
+        if remaining > 0:
+            time.sleep(remaining)
 
 
 def perform_click(target: Target, box: BoundingBox) -> None:
-    x, y = random_point_within_region(box, target.click_margin)
+    # One generator call covers the click point and all three delays.
+    draws = RNG.random(5)
+    x, y = random_point_within_region(box, target.click_margin, draws[:2])
 
-    move_duration = choose_random(target.move_duration_range)
-    pyautogui.moveTo(x, y, duration=move_duration)
+    move_duration = scale_uniform(draws[2], target.move_duration_range)
+    smooth_move(x, y, move_duration)
 
-    time.sleep(choose_random(target.pre_click_delay_range))
+    time.sleep(scale_uniform(draws[3], target.pre_click_delay_range))
     pyautogui.click(x, y)
-    time.sleep(choose_random(target.post_click_delay_range))
+    time.sleep(scale_uniform(draws[4], target.post_click_delay_range))
 
 
 def run(targets: Sequence[Target], scan_interval: Range, confidence_override: Optional[float]) -> None:
@@ -230,20 +933,83 @@ def run(targets: Sequence[Target], scan_interval: Range, confidence_override: Op
     print("Starting Onmyoji automation. Move mouse to top-left corner to abort instantly.")
     print("Press Ctrl+C to stop.")
 
+    soa = TargetSoA.from_targets(targets)
+    if confidence_override is None:
+        thresholds = soa.confidences
+    else:
+        thresholds = np.full(len(soa), confidence_override, dtype=np.float64)
+    scheduler = ScanScheduler(soa)
+    # Digest of the frame each target last missed on. Matching is deterministic,
+    # so an identical frame cannot produce a hit and is skipped outright.
+    missed_on: List[Optional[bytes]] = [None] * len(soa)
+    screen_width, screen_height = pyautogui.size()
+    plan = plan_captures(soa.region_keys, (0, 0, screen_width, screen_height))
+    producer = FrameProducer(outer for outer, _ in plan.values())
+    producer.start()
+    capture_at = time.perf_counter()
     try:
         while True:
-            for target in targets:
-                threshold = confidence_override or target.confidence
-                box = locate_target(target, threshold)
+            images = producer.acquire(not_before=capture_at)
+            frames: List[Optional[ScanFrame]] = [None] * len(soa.region_keys)
+            for index in scheduler.order():
+                region_id = soa.region_ids[index]
+                frame = frames[region_id]
+                if frame is None:
+                    region = soa.region_keys[region_id]
+                    outer, window = plan[region]
+                    frame = frames[region_id] = ScanFrame(images[outer][window], region)
+                digest = frame.digest()
+                if missed_on[index] == digest:
+                    scheduler.record_miss(index)
+                    continue
+
+                threshold = float(thresholds[index])
+                target = soa.targets[index]
+                box = locate_target(target, threshold, frame)
                 if box:
-                    print(f"[+] Detected '{target.name}' at {box} (score >= {threshold}) -> clicking")
+                    print(f"[+] Detected '{soa.names[index]}' at {box} (score >= {threshold}) -> clicking")
+                    scheduler.record_hit(index)
                     perform_click(target, box)
+                    missed_on = [None] * len(soa)
+                    capture_at = time.perf_counter()
                     break
+                missed_on[index] = digest
+                scheduler.record_miss(index)
             else:
                 idle_delay = choose_random(scan_interval)
+                # Start the next capture early enough that it is ready when we wake up.
+                capture_at = time.perf_counter() + max(idle_delay - producer.capture_seconds, 0.0)
+                producer.request(capture_at)
                 time.sleep(idle_delay)
     except KeyboardInterrupt:
         print("\nStopped by user.")
+    finally:
+        producer.stop()
+
+
+def enable_opencl() -> bool:
+    """Route the coarse sweep through OpenCL if a device is available."""
+    global _USE_OPENCL
+    if not cv2.ocl.haveOpenCL():
+        return False
+    cv2.ocl.setUseOpenCL(True)
+    _USE_OPENCL = cv2.ocl.useOpenCL()
+    return _USE_OPENCL
+
+
+def configure_cv_threads(targets: Sequence[Target]) -> int:
+    """Size OpenCV's thread pool for the largest search region and return the count."""
+    screen_width, screen_height = pyautogui.size()
+    largest = max(
+        (t.search_region[2] * t.search_region[3] if t.search_region else screen_width * screen_height)
+        for t in targets
+    )
+    if largest < CV_SINGLE_THREAD_AREA:
+        threads = 1
+    else:
+        threads = min(CV_MAX_THREADS, os.cpu_count() or 1)
+    cv2.setNumThreads(threads)
+    return threads
 
 
 def parse_args(argv: Sequence[str]) -> argparse.Namespace:
@@ -268,6 +1034,11 @@ def parse_args(argv: Sequence[str]) -> argparse.Namespace:
         default=None,
         help="Override confidence for all targets (0-1). Uses per-target value if omitted.",
     )
+    parser.add_argument(
+        "--opencl",
+        action="store_true",
+        help="Run the full-frame template search on the GPU via OpenCL when available.",
+    )
     return parser.parse_args(argv)
 
 
@@ -295,6 +1066,9 @@ def main(argv: Sequence[str] | None = None) -> int:
         print("Confidence must be in (0, 1].", file=sys.stderr)
         return 2
 
+    if args.opencl and not enable_opencl():
+        print("OpenCL is not available; matching on the CPU.", file=sys.stderr)
+    configure_cv_threads(targets)
     run(targets, scan_interval, args.confidence)
     return 0
 